@@ -0,0 +1,99 @@
+"""Directory scanning and division index helpers for the data/divisions tree.
+
+``os.scandir`` exposes the entry type from the directory listing itself, so
+filtering divisions and group files does not cost a ``stat`` per entry.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import yaml
+
+from _yamlcache import load_yaml
+
+GroupRef = Tuple[Optional[str], Path]
+
+# A top-level ``id: value`` line holding a plain or simply quoted token.
+_ID_RE = re.compile(rb'^id:[ \t]*(["\']?)([\w.-]+)\1[ \t]*\r?\n', re.MULTILINE)
+_ID_HEAD_BYTES = 512
+_STR_TAG = 'tag:yaml.org,2002:str'
+_RESOLVER = yaml.resolver.Resolver()
+
+
+def sorted_subdirs(root: str | os.PathLike[str]) -> List[os.DirEntry[str]]:
+    with os.scandir(root) as it:
+        entries = [entry for entry in it if entry.is_dir()]
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def sorted_yaml_files(root: str | os.PathLike[str]) -> List[os.DirEntry[str]]:
+    with os.scandir(root) as it:
+        entries = [entry for entry in it if entry.name.endswith('.yml') and entry.is_file()]
+    entries.sort(key=lambda entry: entry.name)
+    return entries
+
+
+def walk_yaml(root: str | os.PathLike[str]) -> Iterator[os.DirEntry[str]]:
+    """Yield every directory and ``.yml`` file below ``root``, depth first.
+
+    Directories are included because adding or removing a file only changes
+    the mtime of its parent directory.
+    """
+    with os.scandir(root) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir():
+            yield entry
+            yield from walk_yaml(entry.path)
+        elif entry.name.endswith('.yml') and entry.is_file():
+            yield entry
+
+
+def peek_group_id(path: str | os.PathLike[str]) -> Optional[str]:
+    """Read a group id from the head of the file without running the YAML parser.
+
+    Returns ``None`` when the head is inconclusive, e.g. the id is missing,
+    non-ASCII, or would not load as a string; callers then parse the file.
+    """
+    with open(path, 'rb') as handle:
+        try:
+            # Only the pages under the head are read in, nothing is copied.
+            head = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            return None
+    with head:
+        match = _ID_RE.search(head, 0, _ID_HEAD_BYTES)
+        if match is None:
+            return None
+        quote, value = match.group(1, 2)
+    value = value.decode('ascii')
+    if not quote and _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) != _STR_TAG:
+        return None
+    return value
+
+
+def load_division(division_dir: Path) -> Tuple[Dict[str, Any], List[GroupRef]]:
+    """Parse ``division.yml`` once and resolve its group entries to paths.
+
+    Group ids are taken from the ``groups`` entries and are ``None`` for bare
+    file references. Paths are not checked for existence.
+    """
+    meta = load_yaml(division_dir / 'division.yml') or {}
+    groups: List[GroupRef] = []
+    for group_ref in meta.get('groups', []):
+        if isinstance(group_ref, dict):
+            group_id = group_ref.get('id')
+            group_file = group_ref.get('file')
+        else:
+            group_id = None
+            group_file = group_ref
+        if not group_file:
+            continue
+        groups.append((group_id, division_dir / group_file))
+    return meta, groups
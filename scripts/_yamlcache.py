@@ -0,0 +1,83 @@
+"""Shared in-process cache of parsed YAML files.
+
+Entries are keyed on the file path together with its mtime and size, so an
+edited file is parsed again while repeated reads within one process are free.
+Files loaded for editing also keep their node tree, whose marks let a writer
+patch a single entry in place (see ``_yamlemit.splice_entry``).
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as _Loader
+
+_StatKey = Tuple[int, int]
+
+_cache: Dict[str, Tuple[_StatKey, Any, Optional[yaml.Node]]] = {}
+
+
+def _stat_key(path_str: str) -> _StatKey:
+    stat = os.stat(path_str)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _load(path: str | os.PathLike[str], keep_node: bool) -> Any:
+    path_str = os.fspath(path)
+    key = _stat_key(path_str)
+    cached = _cache.get(path_str)
+    if cached is not None and cached[0] == key and (cached[2] is not None or not keep_node):
+        return cached[1]
+    # libyaml decodes UTF-8 itself, so skip the text-mode wrapper.
+    with open(path_str, 'rb') as handle:
+        loader = _Loader(handle.read())
+    try:
+        # What yaml.load does, but with the composed node at hand.
+        node = loader.get_single_node()
+        payload = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+    _cache[path_str] = (key, payload, node if keep_node else None)
+    return payload
+
+
+def load_yaml(path: str | os.PathLike[str]) -> Any:
+    """Return the parsed document; the result is shared and must not be mutated."""
+    return _load(path, keep_node=False)
+
+
+def load_yaml_mut(path: str | os.PathLike[str]) -> Any:
+    """Return a private copy of the parsed document that callers may edit.
+
+    The node tree is kept as well, for ``cached_node``.
+    """
+    return copy.deepcopy(_load(path, keep_node=True))
+
+
+def cached_node(path: str | os.PathLike[str]) -> Optional[yaml.Node]:
+    """Node tree of the file as last parsed, or ``None`` if it changed since.
+
+    Only files loaded through ``load_yaml_mut`` have a node tree; files read
+    with ``load_yaml`` or recorded through ``remember_yaml`` do not.
+    """
+    path_str = os.fspath(path)
+    cached = _cache.get(path_str)
+    if cached is None or cached[0] != _stat_key(path_str):
+        return None
+    return cached[2]
+
+
+def remember_yaml(path: str | os.PathLike[str], payload: Any) -> None:
+    """Record ``payload`` as the content of a file that was just written.
+
+    The cache takes ownership: callers must not mutate ``payload`` afterwards.
+    """
+    path_str = os.fspath(path)
+    _cache[path_str] = (_stat_key(path_str), payload, None)
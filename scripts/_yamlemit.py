@@ -0,0 +1,180 @@
+"""Fast YAML rendering for group files.
+
+Group files are block mappings and sequences of short strings and integers.
+``render_yaml`` writes that shape directly, producing the same text as
+``yaml.dump(..., allow_unicode=True, sort_keys=False)``, and hands anything
+else (floats, long or unusual strings, shared objects, ...) to PyYAML.
+``splice_entry`` rewrites a single mapping entry of an existing file in place.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as _Dumper
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeDumper as _Dumper
+
+# Strings made only of these characters never need escaping; PyYAML writes
+# them plain, or single-quoted when they would resolve to another type.
+# A colon is only an indicator when followed by a space or at the end.
+_SIMPLE_RE = re.compile(r'\w[\w .,:()/+«»—–-]*')
+_STR_TAG = 'tag:yaml.org,2002:str'
+_RESOLVER = yaml.resolver.Resolver()
+# PyYAML folds a scalar only once the line is longer than this.
+_WIDTH = 80
+# Anchors and aliases make nodes shared; splicing one of them is not safe.
+_ANCHOR_RE = re.compile(r'(?:^|[\s\[{,])[&*][^\s,\]}]', re.MULTILINE)
+# Line breaks libyaml counts besides '\n'; line numbers would not match split().
+_OTHER_BREAKS = ('\r', '\x85', '\u2028', '\u2029', '\ufeff')
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _scalar(value: Any, column: int) -> str:
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, int):
+        return str(value)
+    if not isinstance(value, str):
+        raise _Unsupported
+    if not value:
+        return "''"
+    if value[-1] in ' :' or ': ' in value or _SIMPLE_RE.fullmatch(value) is None:
+        raise _Unsupported
+    if _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) != _STR_TAG:
+        value = f"'{value}'"
+    if column + len(value) > _WIDTH:
+        raise _Unsupported
+    return value
+
+
+def _mapping(mapping: Dict[Any, Any], indent: int, lines: List[str], seen: Set[int], lead: str | None = None) -> None:
+    if id(mapping) in seen:
+        raise _Unsupported  # PyYAML would emit an anchor/alias pair
+    seen.add(id(mapping))
+    for key, value in mapping.items():
+        if not isinstance(key, str):
+            raise _Unsupported
+        prefix = ' ' * indent if lead is None else lead
+        lead = None
+        head = f'{prefix}{_scalar(key, len(prefix))}:'
+        if isinstance(value, dict):
+            if value:
+                lines.append(head)
+                _mapping(value, indent + 2, lines, seen)
+            else:
+                lines.append(f'{head} {{}}')
+        elif isinstance(value, list):
+            if value:
+                lines.append(head)
+                _sequence(value, indent, lines, seen)
+            else:
+                lines.append(f'{head} []')
+        else:
+            lines.append(f'{head} {_scalar(value, len(head) + 1)}')
+
+
+def _sequence(items: List[Any], indent: int, lines: List[str], seen: Set[int]) -> None:
+    if id(items) in seen:
+        raise _Unsupported
+    seen.add(id(items))
+    lead = ' ' * indent + '- '
+    for item in items:
+        if isinstance(item, dict) and item:
+            _mapping(item, indent + 2, lines, seen, lead)
+        elif isinstance(item, (dict, list)):
+            raise _Unsupported
+        else:
+            lines.append(lead + _scalar(item, len(lead)))
+
+
+def render_yaml(payload: Any) -> str:
+    if isinstance(payload, dict) and payload:
+        lines: List[str] = []
+        try:
+            _mapping(payload, 0, lines, set())
+        except _Unsupported:
+            pass
+        else:
+            lines.append('')
+            return '\n'.join(lines)
+    return yaml.dump(payload, Dumper=_Dumper, allow_unicode=True, sort_keys=False)
+
+
+def _entry(node: yaml.Node, key: str) -> Optional[Tuple[yaml.Node, yaml.Node]]:
+    if not isinstance(node, yaml.MappingNode) or node.flow_style:
+        return None
+    found = None
+    for key_node, value_node in node.value:
+        if not isinstance(key_node, yaml.ScalarNode) or key_node.tag != _STR_TAG:
+            return None  # merge keys and complex keys are left to PyYAML
+        if key_node.value == key:
+            if found is not None:
+                return None
+            found = key_node, value_node
+    return found
+
+
+def splice_entry(text: str, root: yaml.Node, keys: Sequence[Union[str, int]], value: Any) -> Optional[str]:
+    """Return ``text`` with the entry at ``keys`` replaced by ``key: value``.
+
+    ``root`` must be the node tree ``text`` was composed into. Only the lines
+    of that entry are rendered again, the rest of the file is kept verbatim.
+    Returns ``None`` when the entry cannot be patched safely; callers then
+    write the whole document.
+    """
+    if any(char in text for char in _OTHER_BREAKS) or _ANCHOR_RE.search(text):
+        return None
+    node = root
+    for key in keys[:-1]:
+        if isinstance(key, int):
+            if not isinstance(node, yaml.SequenceNode) or node.flow_style or not 0 <= key < len(node.value):
+                return None
+            node = node.value[key]
+        else:
+            entry = _entry(node, key)
+            if entry is None:
+                return None
+            node = entry[1]
+    entry = _entry(node, keys[-1])
+    if entry is None:
+        return None
+    key_node, value_node = entry
+
+    lines = text.split('\n')
+    start, column = key_node.start_mark.line, key_node.start_mark.column
+    lead = lines[start][:column]
+    if lead.strip() not in ('', '-'):
+        return None
+    end_mark = value_node.end_mark
+    block_value = isinstance(value_node, (yaml.MappingNode, yaml.SequenceNode)) and not value_node.flow_style
+    if block_value or end_mark.column == 0:
+        # Block values end where the next token starts.
+        end = end_mark.line
+        if end < len(lines) and lines[end][:end_mark.column].strip():
+            return None
+        # Comments and blank lines before the next token stay in place.
+        while end > start + 1 and lines[end - 1].lstrip()[:1] in ('', '#'):
+            end -= 1
+    else:
+        rest = lines[end_mark.line][end_mark.column:].strip()
+        if rest and not rest.startswith('#'):
+            return None
+        end = end_mark.line + 1
+
+    block: List[str] = []
+    try:
+        _mapping({keys[-1]: value}, column, block, set(), lead if lead.strip() else None)
+    except _Unsupported:
+        return None
+    lines[start:end] = block
+    return '\n'.join(lines)
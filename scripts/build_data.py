@@ -5,18 +5,32 @@ from __future__ import annotations
 
 import argparse
 import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Tuple
 
-import yaml
+try:
+    import orjson
+except ImportError:  # optional speed-up, stdlib json is used otherwise
+    orjson = None
+
+from _fsutil import write_atomic
+from _layout import load_division, sorted_subdirs, walk_yaml
+from _yamlcache import load_yaml
 
 ROOT = Path(__file__).resolve().parents[1] / 'data'
 DIVISIONS_ORDER = ['gold', 'silver', 'ladies', 'mix']
+_ORDER_LOOKUP = MappingProxyType({division_id: index for index, division_id in enumerate(DIVISIONS_ORDER)})
+_ORDER_MAX = len(DIVISIONS_ORDER)
 
 
-def load_yaml(path: Path) -> Any:
-    with path.open('r', encoding='utf-8') as handle:
-        return yaml.safe_load(handle)
+def _load_group(path: Path) -> Dict[str, Any]:
+    try:
+        return load_yaml(path) or {}
+    except FileNotFoundError:
+        raise FileNotFoundError(f'Group file {path} is missing') from None
 
 
 def build_payload(data_root: Path) -> Dict[str, Any]:
@@ -27,44 +41,34 @@ def build_payload(data_root: Path) -> Dict[str, Any]:
     season = load_yaml(season_path) or {}
     rules = load_yaml(rules_path) or {}
 
-    divisions: List[Dict[str, Any]] = []
-
-    order_lookup = {division_id: index for index, division_id in enumerate(DIVISIONS_ORDER)}
-
-    for division_dir in sorted(divisions_root.iterdir()):
-        if not division_dir.is_dir():
-            continue
-        division_meta_path = division_dir / 'division.yml'
-        if not division_meta_path.exists():
+    division_entries: List[Tuple[Path, Dict[str, Any], List[Path]]] = []
+    for entry in sorted_subdirs(divisions_root):
+        division_dir = Path(entry.path)
+        try:
+            division_meta, group_refs = load_division(division_dir)
+        except FileNotFoundError:
             continue
-        division_meta = load_yaml(division_meta_path) or {}
-        division_id = division_meta.get('id') or division_dir.name
+        division_entries.append((division_dir, division_meta, [path for _, path in group_refs]))
 
-        groups_data: List[Dict[str, Any]] = []
-        for group_ref in division_meta.get('groups', []):
-            if isinstance(group_ref, dict):
-                group_file = group_ref.get('file')
-            else:
-                group_file = group_ref
-            if not group_file:
-                continue
-            candidate = division_dir / group_file
-            if not candidate.exists():
-                raise FileNotFoundError(f'Group file {candidate} is missing')
-            group_payload = load_yaml(candidate) or {}
-            groups_data.append(group_payload)
+    # Group files are independent, so overlap their reads before assembling divisions.
+    group_paths = [path for _, _, paths in division_entries for path in paths]
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+        parsed_groups = dict(zip(group_paths, executor.map(_load_group, group_paths)))
 
+    keyed_divisions: List[Tuple[int, Dict[str, Any]]] = []
+    for division_dir, division_meta, paths in division_entries:
+        division_id = division_meta.get('id') or division_dir.name
         division_payload = {
             key: division_meta.get(key)
             for key in ('id', 'title', 'description')
             if division_meta.get(key) is not None
         }
-        division_payload['groups'] = groups_data
-        division_payload['_order'] = order_lookup.get(division_id, len(order_lookup))
+        division_payload['groups'] = [parsed_groups[path] for path in paths]
 
-        divisions.append(division_payload)
+        keyed_divisions.append((_ORDER_LOOKUP.get(division_id, _ORDER_MAX), division_payload))
 
-    divisions.sort(key=lambda item: item.pop('_order', len(order_lookup)))
+    keyed_divisions.sort(key=lambda item: item[0])
+    divisions = [division_payload for _, division_payload in keyed_divisions]
 
     return {
         'season': season,
@@ -73,6 +77,100 @@ def build_payload(data_root: Path) -> Dict[str, Any]:
     }
 
 
+def newest_input_mtime(data_root: Path, exclude: Iterable[Path] = ()) -> int:
+    excluded = {os.fspath(path) for path in exclude}
+    return max(
+        (entry.stat().st_mtime_ns for entry in walk_yaml(data_root) if entry.path not in excluded),
+        default=0,
+    )
+
+
+def is_up_to_date(data_root: Path, output: Path, exclude: Iterable[Path] = ()) -> bool:
+    """True when ``output`` is strictly newer than every YAML input (minus ``exclude``).
+
+    Equal timestamps count as stale: on filesystems with coarse mtimes an
+    input edited right after the build may share the output's timestamp.
+    """
+    try:
+        output_mtime = os.stat(output).st_mtime_ns
+    except FileNotFoundError:
+        return False
+    return output_mtime > newest_input_mtime(data_root, exclude)
+
+
+def _orjson_compatible(value: Any) -> bool:
+    """False for data orjson would encode differently from json.dumps.
+
+    orjson writes floats in its own format (NaN as null, 1e16 without a plus
+    sign) and turns date keys into strings where json.dumps raises.
+    """
+    if isinstance(value, dict):
+        return all(
+            (key is None or isinstance(key, (str, int))) and _orjson_compatible(item)
+            for key, item in value.items()
+        )
+    if isinstance(value, list):
+        return all(_orjson_compatible(item) for item in value)
+    return not isinstance(value, float)
+
+
+def serialize_payload(payload: Dict[str, Any], indent: int = 2) -> bytes:
+    """Encode ``payload`` as json.dumps would; orjson is only a faster route to the same bytes."""
+    if orjson is not None and indent == 2 and _orjson_compatible(payload):
+        # NON_STR_KEYS turns int/bool/None keys into strings, as json.dumps does;
+        # PASSTHROUGH_DATETIME makes dates fail here as they do in json.dumps.
+        try:
+            return orjson.dumps(
+                payload,
+                option=orjson.OPT_INDENT_2
+                | orjson.OPT_APPEND_NEWLINE
+                | orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:  # e.g. dates or integers wider than 64 bits
+            pass
+    return (json.dumps(payload, ensure_ascii=False, indent=indent) + '\n').encode('utf-8')
+
+
+def write_if_changed(path: Path, data: bytes) -> bool:
+    """Atomically replace ``path`` with ``data``; return False if it already matched.
+
+    An unchanged file is still touched so that it stays newer than its inputs.
+    """
+    try:
+        if path.read_bytes() == data:
+            os.utime(path)
+            return False
+    except FileNotFoundError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, data)
+    return True
+
+
+_json_cache: Dict[str, Tuple[int, Any]] = {}
+
+
+def load_json(path: Path) -> Any:
+    """Parse a JSON file, reusing the previous result while its mtime is unchanged."""
+    key = os.fspath(path)
+    mtime_ns = os.stat(key).st_mtime_ns
+    cached = _json_cache.get(key)
+    if cached is not None and cached[0] == mtime_ns:
+        return cached[1]
+    data = path.read_bytes()
+    payload = orjson.loads(data) if orjson is not None else json.loads(data)
+    _json_cache[key] = (mtime_ns, payload)
+    return payload
+
+
+def write_json(path: Path, payload: Dict[str, Any], indent: int = 2) -> bool:
+    """Write ``payload`` via write_if_changed and remember it for load_json."""
+    changed = write_if_changed(path, serialize_payload(payload, indent))
+    _json_cache[os.fspath(path)] = (path.stat().st_mtime_ns, payload)
+    return changed
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -88,14 +186,20 @@ def main() -> None:
         help='Root directory containing season.yml, rules.yml and divisions/',
     )
     parser.add_argument('--indent', type=int, default=2, help='JSON indentation (default: 2)')
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild even if the output is newer than every YAML file',
+    )
 
     args = parser.parse_args()
 
+    # The output may have been written with other options, so only the default build is skipped.
+    if not args.force and args.indent == 2 and is_up_to_date(args.root, args.output):
+        return
+
     payload = build_payload(args.root)
-    args.output.parent.mkdir(parents=True, exist_ok=True)
-    with args.output.open('w', encoding='utf-8') as handle:
-        json.dump(payload, handle, ensure_ascii=False, indent=args.indent)
-        handle.write('\n')
+    write_json(args.output, payload, args.indent)
 
 
 if __name__ == '__main__':
@@ -4,16 +4,32 @@
 from __future__ import annotations
 
 import argparse
-import subprocess
+import copy
+import functools
+import json
+import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List, Sequence, Tuple
+from typing import Any, Dict, List, Sequence, Tuple, Union
 
-import yaml
+import build_data
+from _fsutil import write_atomic
+from _layout import load_division, peek_group_id, sorted_subdirs, sorted_yaml_files
+from _yamlcache import cached_node, load_yaml, load_yaml_mut, remember_yaml
+from _yamlemit import render_yaml, splice_entry
 
 DATA_ROOT = Path(__file__).resolve().parents[1] / 'data'
 STATUS_CHOICES = ['scheduled', 'played', 'wo']
 WINNER_CHOICES = ['home', 'away']
+_SET_RE = re.compile(r'\s*(\d+)\s*-\s*(\d+)\s*')
+
+# Статус -> (поля result, которые сохраняются, поля, которые можно задать при обновлении).
+_RESULT_FIELDS = ('winner', 'sets', 'reason')
+_STATUS_FIELDS: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {
+    'scheduled': ((), ('reason',)),
+    'wo': (('winner', 'reason'), ('winner', 'reason')),
+}
+_PLAYED_FIELDS = (_RESULT_FIELDS, _RESULT_FIELDS)
 
 
 class MatchError(RuntimeError):
@@ -24,14 +40,74 @@ class UserAbort(RuntimeError):
     pass
 
 
-def load_yaml(path: Path) -> Any:
-    with path.open('r', encoding='utf-8') as handle:
-        return yaml.safe_load(handle)
+EntryPath = Sequence[Union[str, int]]
+
+
+def dump_yaml(path: Path, payload: Any, entry: EntryPath | None = None) -> None:
+    """Записывает YAML; если изменилась только запись entry, переписываются лишь её строки."""
+    text = None
+    if entry is not None:
+        original = path.read_bytes().decode('utf-8')
+        root = cached_node(path)
+        if root is not None:
+            value = payload
+            for key in entry:
+                value = value[key]
+            text = splice_entry(original, root, entry, value)
+    if text is None:
+        text = render_yaml(payload)
+    write_atomic(path, text.encode('utf-8'))
+    remember_yaml(path, payload)
+
+
+# Группы, изменённые в режиме --defer-write и ещё не записанные на диск.
+_pending_groups: Dict[Path, Dict[str, Any]] = {}
+# Индексы матчей отложенных групп: путь -> (список matches, ID матча -> позиция).
+_match_indexes: Dict[Path, Tuple[List[Any], Dict[Any, int]]] = {}
+
 
+def read_group(path: Path) -> Dict[str, Any]:
+    """Текущее содержимое группы с учётом отложенных правок (только для чтения)."""
+    pending = _pending_groups.get(path)
+    if pending is not None:
+        return pending
+    return load_yaml(path) or {}
+
+
+def load_group(path: Path) -> Dict[str, Any]:
+    """Содержимое группы, которое можно изменять и затем передать в save_group."""
+    pending = _pending_groups.get(path)
+    if pending is not None:
+        return pending
+    return load_yaml_mut(path) or {}
+
+
+def save_group(
+    path: Path,
+    payload: Dict[str, Any],
+    *,
+    defer_write: bool = False,
+    entry: EntryPath | None = None,
+) -> None:
+    if defer_write:
+        _pending_groups[path] = payload
+    else:
+        _match_indexes.pop(path, None)
+        dump_yaml(path, payload, entry)
 
-def dump_yaml(path: Path, payload: Any) -> None:
-    with path.open('w', encoding='utf-8') as handle:
-        yaml.safe_dump(payload, handle, allow_unicode=True, sort_keys=False)
+
+def flush_groups() -> Dict[Path, Dict[str, Any]]:
+    """Записывает отложенные группы и возвращает их."""
+    flushed = dict(_pending_groups)
+    discard_pending()
+    for path, payload in flushed.items():
+        dump_yaml(path, payload)
+    return flushed
+
+
+def discard_pending() -> None:
+    _pending_groups.clear()
+    _match_indexes.clear()
 
 
 def parse_sets(value: str) -> List[Dict[str, int]]:
@@ -39,54 +115,118 @@ def parse_sets(value: str) -> List[Dict[str, int]]:
         return []
     sets: List[Dict[str, int]] = []
     for item in value.split(','):
-        item = item.strip()
-        if not item:
-            continue
-        if '-' not in item:
-            raise ValueError(f"Формат сета '{item}' должен быть в виде 6-4")
-        home_raw, away_raw = item.split('-', 1)
-        try:
-            home_score = int(home_raw)
-            away_score = int(away_raw)
-        except ValueError as exc:
-            raise ValueError(f"Счёт '{item}' должен содержать числа") from exc
-        sets.append({'home': home_score, 'away': away_score})
+        match = _SET_RE.fullmatch(item)
+        if match is None:
+            item = item.strip()
+            if not item:
+                continue
+            if '-' not in item:
+                raise ValueError(f"Формат сета '{item}' должен быть в виде 6-4")
+            raise ValueError(f"Счёт '{item}' должен содержать числа")
+        sets.append({'home': int(match[1]), 'away': int(match[2])})
     return sets
 
 
 def sets_to_string(sets: Sequence[Dict[str, Any]] | None) -> str:
     if not sets:
         return ''
-    chunks: List[str] = []
-    for item in sets:
-        if not isinstance(item, dict):
-            continue
-        chunks.append(f"{item.get('home', '?')}-{item.get('away', '?')}")
-    return ','.join(chunks)
+    return ','.join(f"{item.get('home', '?')}-{item.get('away', '?')}" for item in sets if isinstance(item, dict))
+
+
+@functools.lru_cache(maxsize=None)
+def _group_index(division_dir: Path, scan_files: bool = False) -> Dict[str, Path]:
+    """ID группы -> файл по division.yml; с scan_files также groups/*.yml вне его списка."""
+    index: Dict[str, Path] = {}
+    try:
+        _, group_refs = load_division(division_dir)
+    except FileNotFoundError:
+        group_refs = []
+    for ref_id, candidate in group_refs:
+        if ref_id and candidate.exists():
+            index.setdefault(ref_id, candidate)
+    if not scan_files:
+        return index
+    try:
+        entries = sorted_yaml_files(division_dir / 'groups')
+    except FileNotFoundError:
+        return index
+    for entry in entries:
+        group_id = peek_group_id(entry.path)
+        if group_id is None:
+            group_id = (load_yaml(entry.path) or {}).get('id')
+        if group_id:
+            index.setdefault(group_id, Path(entry.path))
+    return index
+
+
+def index_matches(matches: Sequence[Dict[str, Any] | None]) -> Dict[Any, int]:
+    """ID матча -> позиция в списке; при повторах побеждает первый, как при линейном поиске."""
+    by_id: Dict[Any, int] = {}
+    for index, match in enumerate(matches):
+        if match is not None:
+            by_id.setdefault(match.get('id'), index)
+    return by_id
+
+
+def group_match_index(path: Path, matches: List[Any]) -> Dict[Any, int]:
+    """index_matches с кэшем: правки одной отложенной группы не перестраивают индекс."""
+    cached = _match_indexes.get(path)
+    if cached is not None and cached[0] is matches:
+        return cached[1]
+    by_id = index_matches(matches)
+    _match_indexes[path] = (matches, by_id)
+    return by_id
 
 
 def find_group_file(division_dir: Path, group_id: str) -> Path:
-    division_meta = load_yaml(division_dir / 'division.yml') or {}
-    for entry in division_meta.get('groups', []):
-        if isinstance(entry, dict) and entry.get('id') == group_id:
-            group_file = entry.get('file')
-            if not group_file:
-                break
-            candidate = division_dir / group_file
-            if candidate.exists():
-                return candidate
-    groups_dir = division_dir / 'groups'
-    if groups_dir.exists():
-        for group_file in groups_dir.glob('*.yml'):
-            payload = load_yaml(group_file) or {}
-            if payload.get('id') == group_id:
-                return group_file
+    # Файлы групп разбираются, только если division.yml не знает такой группы.
+    for scan_files in (False, True):
+        path = _group_index(division_dir, scan_files).get(group_id)
+        if path is not None:
+            return path
     raise MatchError(f'Не удалось найти файл группы для {group_id}')
 
 
 def rebuild_json() -> None:
-    build_script = Path(__file__).resolve().with_name('build_data.py')
-    subprocess.run(['python', str(build_script)], check=True)
+    payload = build_data.build_payload(DATA_ROOT)
+    build_data.write_json(DATA_ROOT / 'divisions.json', payload)
+
+
+def incremental_rebuild(
+    division_id: str,
+    group_id: str,
+    group_payload: Dict[str, Any],
+    group_path: Path,
+) -> None:
+    """Подменяет в divisions.json только изменённую группу, иначе пересобирает файл целиком."""
+    output = DATA_ROOT / 'divisions.json'
+    # Если после сборки JSON менялись другие YAML-файлы, точечной замены недостаточно.
+    # Каталог группы исключается тоже: атомарная запись файла обновляет его mtime.
+    if not build_data.is_up_to_date(DATA_ROOT, output, exclude=[group_path, group_path.parent]):
+        rebuild_json()
+        return
+    try:
+        payload = build_data.load_json(output)
+    except (FileNotFoundError, json.JSONDecodeError):
+        rebuild_json()
+        return
+    for division in payload.get('divisions') or []:
+        if division.get('id') != division_id:
+            continue
+        groups = division.get('groups') or []
+        for index, group in enumerate(groups):
+            if group.get('id') == group_id:
+                groups[index] = group_payload
+                build_data.write_json(output, payload)
+                return
+    rebuild_json()
+
+
+def _set_or_drop(result: Dict[str, Any], key: str, value: Any) -> None:
+    if value:
+        result[key] = value
+    else:
+        result.pop(key, None)
 
 
 def update_match(
@@ -102,27 +242,30 @@ def update_match(
     reason: str | None,
     clear_sets: bool,
     new_id: str | None,
-) -> Tuple[Path, str]:
+    defer_write: bool = False,
+) -> Tuple[Path, str, bool]:
+    """Обновляет матч; третий элемент результата — изменилось ли что-нибудь."""
     division_dir = DATA_ROOT / 'divisions' / division_id
     if not division_dir.exists():
         raise MatchError(f'Дивизион {division_id} не найден')
 
     group_path = find_group_file(division_dir, group_id)
-    group_payload = load_yaml(group_path) or {}
+    group_payload = load_group(group_path)
     matches = group_payload.get('matches') or []
 
-    target = None
-    for match in matches:
-        if match.get('id') == match_id:
-            target = match
-            break
-    if target is None:
+    by_id = group_match_index(group_path, matches)
+    if match_id not in by_id:
         raise MatchError(f'Матч {match_id} не найден в группе {group_id}')
+    target = matches[by_id[match_id]]
+    # Меняется только сам матч, поэтому сравнивать достаточно его.
+    before = copy.deepcopy(target)
 
     if new_id and new_id != match_id:
-        if any(m.get('id') == new_id for m in matches if m is not target):
+        if new_id in by_id:
             raise MatchError(f'В группе уже есть матч с id {new_id}')
         target['id'] = new_id
+        # Под старым ID мог оказаться дубликат, проще пересчитать индекс заново.
+        _match_indexes.pop(group_path, None)
 
     if date is not None:
         if date:
@@ -140,45 +283,30 @@ def update_match(
 
     effective_status = result.get('status', 'scheduled')
 
-    if effective_status == 'scheduled':
-        result.pop('winner', None)
-        result.pop('sets', None)
-        if reason is not None:
-            if reason:
-                result['reason'] = reason
-            else:
-                result.pop('reason', None)
-        else:
-            result.pop('reason', None)
-    elif effective_status == 'wo':
-        if winner:
-            result['winner'] = winner
-        if reason is not None:
-            if reason:
-                result['reason'] = reason
-            else:
-                result.pop('reason', None)
-        if reason is None and result.get('reason') is None:
-            result.pop('reason', None)
-        result.pop('sets', None)
-    else:  # played
-        if winner:
-            result['winner'] = winner
+    keep, accept = _STATUS_FIELDS.get(effective_status, _PLAYED_FIELDS)
+    for key in _RESULT_FIELDS:
+        if key not in keep:
+            result.pop(key, None)
+    if winner and 'winner' in accept:
+        result['winner'] = winner
+    if 'sets' in accept:
         if sets is not None:
-            if sets:
-                result['sets'] = sets
-            else:
-                result.pop('sets', None)
+            _set_or_drop(result, 'sets', sets)
         elif clear_sets:
             result.pop('sets', None)
-        if reason is not None:
-            if reason:
-                result['reason'] = reason
-            else:
-                result.pop('reason', None)
+    if reason is not None:
+        if 'reason' in accept:
+            _set_or_drop(result, 'reason', reason)
+    elif effective_status == 'wo' and result.get('reason') is None:
+        result.pop('reason', None)
 
-    dump_yaml(group_path, group_payload)
-    return group_path, target.get('id', match_id)
+    changed = target != before
+    if changed:
+        entry = None
+        if list(target) == list(before) and all(target[key] == before[key] for key in before if key != 'result'):
+            entry = ('matches', by_id[match_id], 'result')
+        save_group(group_path, group_payload, defer_write=defer_write, entry=entry)
+    return group_path, target.get('id', match_id), changed
 
 
 def add_match(
@@ -194,6 +322,7 @@ def add_match(
     date: str | None,
     round_no: int | None,
     reason: str | None,
+    defer_write: bool = False,
 ) -> Tuple[Path, str]:
     if status not in STATUS_CHOICES:
         raise MatchError(f'Недопустимый статус {status}')
@@ -203,13 +332,14 @@ def add_match(
         raise MatchError(f'Дивизион {division_id} не найден')
 
     group_path = find_group_file(division_dir, group_id)
-    group_payload = load_yaml(group_path) or {}
+    group_payload = load_group(group_path)
     matches = group_payload.get('matches')
     if not isinstance(matches, list):
         matches = []
         group_payload['matches'] = matches
 
-    if any(m.get('id') == match_id for m in matches):
+    by_id = group_match_index(group_path, matches)
+    if match_id in by_id:
         raise MatchError(f'Матч с id {match_id} уже существует')
 
     new_match: Dict[str, Any] = {
@@ -245,8 +375,9 @@ def add_match(
             result['reason'] = reason
 
     new_match['result'] = result
+    by_id[match_id] = len(matches)
     matches.append(new_match)
-    dump_yaml(group_path, group_payload)
+    save_group(group_path, group_payload, defer_write=defer_write)
     return group_path, match_id
 
 
@@ -257,18 +388,20 @@ def collect_divisions() -> List[Dict[str, Any]]:
     if not divisions_root.exists():
         return []
     items: List[Dict[str, Any]] = []
-    for division_dir in sorted(divisions_root.iterdir()):
-        if not division_dir.is_dir():
-            continue
-        meta_path = division_dir / 'division.yml'
-        meta = load_yaml(meta_path) if meta_path.exists() else {}
+    for entry in sorted_subdirs(divisions_root):
+        division_dir = Path(entry.path)
+        try:
+            meta, group_refs = load_division(division_dir)
+        except FileNotFoundError:
+            meta, group_refs = {}, []
         division_id = meta.get('id') or division_dir.name
         items.append({
             'id': division_id,
             'title': meta.get('title') or division_id,
             'description': meta.get('description') or '',
             'path': division_dir,
-            'meta': meta or {},
+            'meta': meta,
+            'groups': group_refs,
         })
     return items
 
@@ -276,21 +409,11 @@ def collect_divisions() -> List[Dict[str, Any]]:
 def collect_groups(division: Dict[str, Any]) -> List[Dict[str, Any]]:
     groups: List[Dict[str, Any]] = []
     seen_ids: set[str] = set()
-    meta_groups = division.get('meta', {}).get('groups', [])
-    for entry in meta_groups:
-        group_id = None
-        group_file = None
-        if isinstance(entry, dict):
-            group_id = entry.get('id')
-            group_file = entry.get('file')
-        else:
-            group_file = entry
-        if not group_file:
-            continue
-        path = division['path'] / group_file
-        if not path.exists():
+    for group_id, path in division.get('groups', []):
+        try:
+            payload = read_group(path)
+        except FileNotFoundError:
             continue
-        payload = load_yaml(path) or {}
         group_id = group_id or payload.get('id') or path.stem
         groups.append({
             'id': group_id,
@@ -302,8 +425,9 @@ def collect_groups(division: Dict[str, Any]) -> List[Dict[str, Any]]:
 
     groups_dir = division['path'] / 'groups'
     if groups_dir.exists():
-        for path in sorted(groups_dir.glob('*.yml')):
-            payload = load_yaml(path) or {}
+        for entry in sorted_yaml_files(groups_dir):
+            path = Path(entry.path)
+            payload = read_group(path)
             group_id = payload.get('id') or path.stem
             if group_id in seen_ids:
                 continue
@@ -320,11 +444,11 @@ def prompt_choice(title: str, options: Sequence[Dict[str, Any]], *, display_fn=N
     if not options:
         raise UserAbort('Нет доступных вариантов для выбора')
     while True:
-        print(title)
+        lines = [title]
         for idx, option in enumerate(options, 1):
             label = display_fn(option) if display_fn else option.get('id', option)
-            code = option.get('id')
-            print(f"  {idx}) {label} [{code}]")
+            lines.append(f"  {idx}) {label} [{option.get('id')}]")
+        sys.stdout.write('\n'.join(lines) + '\n')
         raw = input('Введите номер или ID (q — выход): ').strip()
         if not raw:
             continue
@@ -404,10 +528,11 @@ def choose_action() -> str:
 def prompt_status(current: str | None) -> str | None:
     current = current or 'scheduled'
     while True:
-        print('Статус матча:')
+        lines = ['Статус матча:']
         for idx, value in enumerate(STATUS_CHOICES, 1):
             marker = ' (текущий)' if value == current else ''
-            print(f'  {idx}) {value}{marker}')
+            lines.append(f'  {idx}) {value}{marker}')
+        sys.stdout.write('\n'.join(lines) + '\n')
         raw = input('Выберите статус (Enter — оставить текущий): ').strip()
         if not raw:
             return None
@@ -422,10 +547,11 @@ def prompt_status(current: str | None) -> str | None:
 
 def prompt_winner(current: str | None, *, required: bool = False) -> str | None:
     while True:
-        print('Победитель (home/away):')
+        lines = ['Победитель (home/away):']
         for idx, value in enumerate(WINNER_CHOICES, 1):
             marker = ' (текущий)' if value == current else ''
-            print(f'  {idx}) {value}{marker}')
+            lines.append(f'  {idx}) {value}{marker}')
+        sys.stdout.write('\n'.join(lines) + '\n')
         raw = input('Введите победителя (Enter — оставить текущий): ').strip()
         if not raw:
             if required and not current:
@@ -514,10 +640,11 @@ def prompt_new_id(default: str | None, existing_ids: Sequence[str]) -> str:
 
 def prompt_team(teams: Sequence[Dict[str, Any]], role: str) -> str:
     if teams:
-        print(f"Выбор команды для роли '{role}':")
+        lines = [f"Выбор команды для роли '{role}':"]
         for idx, team in enumerate(teams, 1):
             title = team.get('name') or team.get('id') or f'Команда {idx}'
-            print(f"  {idx}) {title}")
+            lines.append(f"  {idx}) {title}")
+        sys.stdout.write('\n'.join(lines) + '\n')
     while True:
         raw = input(f"Введите номер или название команды для '{role}': ").strip()
         if not raw:
@@ -535,10 +662,16 @@ def prompt_team(teams: Sequence[Dict[str, Any]], role: str) -> str:
         return raw
 
 
-def interactive_update(division: Dict[str, Any], group: Dict[str, Any], *, no_build: bool) -> None:
+def interactive_update(
+    division: Dict[str, Any],
+    group: Dict[str, Any],
+    *,
+    no_build: bool,
+    defer_write: bool = False,
+) -> None:
     match = choose_match(group)
     group_path = group['path']
-    group_payload = load_yaml(group_path) or {}
+    group_payload = read_group(group_path)
     matches = group_payload.get('matches') or []
     existing_ids = [item.get('id') for item in matches if item is not None]
 
@@ -572,7 +705,7 @@ def interactive_update(division: Dict[str, Any], group: Dict[str, Any], *, no_bu
     else:
         reason = prompt_reason(result.get('reason'))
 
-    updated_path, resulting_id = update_match(
+    updated_path, resulting_id, changed = update_match(
         division['id'],
         group['id'],
         current_id,
@@ -584,16 +717,29 @@ def interactive_update(division: Dict[str, Any], group: Dict[str, Any], *, no_bu
         reason=reason,
         clear_sets=False,
         new_id=new_id,
+        defer_write=defer_write,
     )
+    if not changed:
+        print(f"Матч {resulting_id} не изменился")
+        return
+    if defer_write:
+        print(f"Изменения матча {resulting_id} будут записаны в {updated_path} в конце сессии")
+        return
     print(f"Матч {resulting_id} обновлён в {updated_path}")
     if not no_build:
-        rebuild_json()
+        incremental_rebuild(division['id'], group['id'], load_yaml(updated_path) or {}, updated_path)
         print('Файл data/divisions.json пересобран')
 
 
-def interactive_create(division: Dict[str, Any], group: Dict[str, Any], *, no_build: bool) -> None:
+def interactive_create(
+    division: Dict[str, Any],
+    group: Dict[str, Any],
+    *,
+    no_build: bool,
+    defer_write: bool = False,
+) -> None:
     group_path = group['path']
-    group_payload = load_yaml(group_path) or {}
+    group_payload = read_group(group_path)
     matches = group_payload.get('matches') or []
     existing_ids = [item.get('id') for item in matches if item is not None]
 
@@ -634,28 +780,160 @@ def interactive_create(division: Dict[str, Any], group: Dict[str, Any], *, no_bu
         date=date,
         round_no=round_no,
         reason=reason,
+        defer_write=defer_write,
     )
+    if defer_write:
+        print(f"Матч {resulting_id} будет добавлен в {created_path} в конце сессии")
+        return
     print(f"Матч {resulting_id} добавлен в {created_path}")
     if not no_build:
-        rebuild_json()
+        incremental_rebuild(division['id'], group['id'], load_yaml(created_path) or {}, created_path)
         print('Файл data/divisions.json пересобран')
 
 
-def run_interactive(no_build: bool) -> None:
+def flush_and_rebuild(touched: Dict[Path, Tuple[str, str]], *, no_build: bool) -> None:
+    """Записывает отложенные группы и один раз обновляет divisions.json."""
+    flushed = flush_groups()
+    for path in flushed:
+        print(f'Сохранены изменения в {path}')
+    if not flushed or no_build:
+        return
+    if len(flushed) == 1:
+        (path, payload), = flushed.items()
+        division_id, group_id = touched[path]
+        incremental_rebuild(division_id, group_id, payload, path)
+    else:
+        rebuild_json()
+    print('Файл data/divisions.json пересобран')
+
+
+def prompt_continue() -> bool:
     try:
-        division = choose_division()
-        group = choose_group(division)
-        action = choose_action()
-        if action == 'update':
-            interactive_update(division, group, no_build=no_build)
-        else:
-            interactive_create(division, group, no_build=no_build)
+        raw = input('Изменить ещё один матч? (y/N): ').strip().lower()
+    except EOFError:
+        return False
+    return raw in {'y', 'yes', 'д', 'да'}
+
+
+def run_interactive(no_build: bool, defer_write: bool = False) -> None:
+    touched: Dict[Path, Tuple[str, str]] = {}
+    try:
+        while True:
+            division = choose_division()
+            group = choose_group(division)
+            action = choose_action()
+            touched[group['path']] = (division['id'], group['id'])
+            if action == 'update':
+                interactive_update(division, group, no_build=no_build, defer_write=defer_write)
+            else:
+                interactive_create(division, group, no_build=no_build, defer_write=defer_write)
+            if not prompt_continue():
+                break
     except UserAbort as exc:
         print(str(exc))
     except KeyboardInterrupt:
         print('\nОперация отменена пользователем')
     except MatchError as exc:
         print(f'Ошибка: {exc}')
+    finally:
+        if defer_write:
+            flush_and_rebuild(touched, no_build=no_build)
+
+
+# -------- пакетный режим --------
+
+_BATCH_STR_FIELDS = ('division', 'group', 'match', 'sets', 'date', 'reason', 'new_id', 'home', 'away')
+_BATCH_BOOL_FIELDS = ('create', 'clear_sets')
+
+
+def apply_batch_entry(entry: Dict[str, Any]) -> Tuple[Path, str, bool]:
+    """Применяет одну запись пакета; ключи совпадают с аргументами командной строки."""
+    if not isinstance(entry, dict):
+        raise MatchError('Запись должна быть объектом')
+    # Те же проверки типов, что делает argparse для аргументов командной строки.
+    for key in _BATCH_STR_FIELDS:
+        value = entry.get(key)
+        if value is not None and not isinstance(value, str):
+            raise MatchError(f'Поле {key} должно быть строкой')
+    for key in _BATCH_BOOL_FIELDS:
+        value = entry.get(key)
+        if value is not None and not isinstance(value, bool):
+            raise MatchError(f'Поле {key} должно быть true или false')
+    round_no = entry.get('round')
+    if round_no is not None and (isinstance(round_no, bool) or not isinstance(round_no, int)):
+        raise MatchError('Поле round должно быть целым числом')
+    division_id = entry.get('division')
+    group_id = entry.get('group')
+    match_id = entry.get('match')
+    if not division_id or not group_id or not match_id:
+        raise MatchError('Нужно указать division, group и match')
+    status = entry.get('status')
+    if status is not None and status not in STATUS_CHOICES:
+        raise MatchError(f'Недопустимый статус {status}')
+    winner = entry.get('winner')
+    if winner is not None and winner not in WINNER_CHOICES:
+        raise MatchError(f'Недопустимый победитель {winner}')
+    sets_raw = entry.get('sets')
+    sets_value = parse_sets(sets_raw) if sets_raw is not None else None
+    if entry.get('create'):
+        if not entry.get('home') or not entry.get('away'):
+            raise MatchError('Для создания матча требуются home и away')
+        path, match_id = add_match(
+            division_id,
+            group_id,
+            match_id,
+            home=entry['home'],
+            away=entry['away'],
+            status=status or 'scheduled',
+            winner=winner,
+            sets=sets_value,
+            date=entry.get('date'),
+            round_no=round_no,
+            reason=entry.get('reason'),
+            defer_write=True,
+        )
+        return path, match_id, True
+    return update_match(
+        division_id,
+        group_id,
+        match_id,
+        status=status,
+        winner=winner,
+        sets=sets_value,
+        date=entry.get('date'),
+        round_no=round_no,
+        reason=entry.get('reason'),
+        clear_sets=entry.get('clear_sets') is True,
+        new_id=entry.get('new_id'),
+        defer_write=True,
+    )
+
+
+def run_batch(batch_path: Path, *, no_build: bool) -> None:
+    """Применяет все записи JSON-файла; каждая группа записывается и JSON пересобирается один раз."""
+    try:
+        entries = json.loads(batch_path.read_text(encoding='utf-8'))
+    except OSError as exc:
+        raise MatchError(f'Не удалось прочитать {batch_path}: {exc}') from exc
+    if not isinstance(entries, list):
+        raise MatchError('Файл пакета должен содержать список изменений')
+    touched: Dict[Path, Tuple[str, str]] = {}
+    try:
+        for number, entry in enumerate(entries, 1):
+            try:
+                path, match_id, changed = apply_batch_entry(entry)
+            except (MatchError, ValueError) as exc:
+                raise MatchError(f'Запись {number}: {exc}') from exc
+            if not changed:
+                print(f'Матч {match_id} не изменился ({path})')
+                continue
+            touched[path] = (entry['division'], entry['group'])
+            print(f'Матч {match_id} обработан ({path})')
+    except BaseException:
+        # Пакет применяется целиком или не применяется вовсе.
+        discard_pending()
+        raise
+    flush_and_rebuild(touched, no_build=no_build)
 
 
 # -------- CLI --------
@@ -683,11 +961,34 @@ def main() -> None:
     parser.add_argument('--away', help='Команда гостей (для создания матча)')
     parser.add_argument('--clear-sets', action='store_true', help='Удалить список сетов при обновлении')
     parser.add_argument('--no-build', action='store_true', help='Не пересобирать divisions.json после изменения')
+    parser.add_argument(
+        '--defer-write',
+        action='store_true',
+        help='В пошаговом режиме записать YAML и пересобрать JSON один раз в конце сессии',
+    )
+    parser.add_argument(
+        '--batch',
+        type=Path,
+        metavar='FILE.json',
+        help='Применить список изменений из JSON-файла (ключи как у аргументов: division, group, match, ...)',
+    )
 
     args = parser.parse_args()
 
+    if args.defer_write and not args.interactive:
+        parser.error('--defer-write используется только вместе с --interactive')
+
+    if args.batch:
+        try:
+            run_batch(args.batch, no_build=args.no_build)
+        except ValueError as exc:
+            print(f'Ошибка: {exc}')
+        except MatchError as exc:
+            print(f'Ошибка: {exc}')
+        return
+
     if args.interactive:
-        run_interactive(args.no_build)
+        run_interactive(args.no_build, args.defer_write)
         return
 
     required = [args.division, args.group]
@@ -720,7 +1021,7 @@ def main() -> None:
             if not args.match:
                 parser.error('Для обновления матча укажите --match')
             sets_value = parse_sets(args.sets) if args.sets is not None else None
-            path, match_id = update_match(
+            path, match_id, changed = update_match(
                 args.division,
                 args.group,
                 args.match,
@@ -733,9 +1034,12 @@ def main() -> None:
                 clear_sets=args.clear_sets,
                 new_id=args.new_id,
             )
+            if not changed:
+                print(f'Матч {match_id} не изменился, запись пропущена')
+                return
             print(f'Матч {match_id} обновлён в {path}')
         if not args.no_build:
-            rebuild_json()
+            incremental_rebuild(args.division, args.group, load_yaml(path) or {}, path)
             print('Файл data/divisions.json пересобран')
     except ValueError as exc:
         print(f'Ошибка: {exc}')